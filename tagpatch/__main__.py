@@ -32,10 +32,19 @@ def artist_name(
     ),
     assume_yes: bool = typer.Option(False, "-y", "--assume-yes"),
     nested: bool = typer.Option(False, "-n", "--nested"),
+    io_order: utils.IoOrder = typer.Option(utils.IoOrder.PATH, "--io-order", case_sensitive=False),
+    manifest_file: pathlib.Path | None = typer.Option(
+        None,
+        "-m",
+        "--manifest",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+    ),
 ) -> None:
     src, dst = utils.prepare_src_dst(src, dst)
 
-    patch = artist_name_patch.ArtistNamePatch(src, dst, nested)
+    patch = artist_name_patch.ArtistNamePatch(src, dst, nested, io_order, manifest_file)
     table = patch.prepare()
     if len(table) == 0:
         typer.echo("No music files found in src.")
@@ -75,10 +84,19 @@ def embed_lrc(
     ),
     assume_yes: bool = typer.Option(False, "-y", "--assume-yes"),
     nested: bool = typer.Option(False, "-n", "--nested"),
+    io_order: utils.IoOrder = typer.Option(utils.IoOrder.PATH, "--io-order", case_sensitive=False),
+    manifest_file: pathlib.Path | None = typer.Option(
+        None,
+        "-m",
+        "--manifest",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+    ),
 ) -> None:
     src, dst = utils.prepare_src_dst(src, dst)
 
-    patch = embed_lrc_patch.EmbedLyricsPatch(src, dst, nested)
+    patch = embed_lrc_patch.EmbedLyricsPatch(src, dst, nested, io_order, manifest_file)
     table = patch.prepare()
     if len(table) == 0:
         typer.echo("No music files found in src.")
@@ -111,8 +129,17 @@ def download_lrc(
     ),
     assume_yes: bool = typer.Option(False, "-y", "--assume-yes"),
     nested: bool = typer.Option(False, "-n", "--nested"),
+    io_order: utils.IoOrder = typer.Option(utils.IoOrder.PATH, "--io-order", case_sensitive=False),
+    manifest_file: pathlib.Path | None = typer.Option(
+        None,
+        "-m",
+        "--manifest",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+    ),
 ) -> None:
-    patch = download_lrc_patch.DownloadLrcPatch(src, nested)
+    patch = download_lrc_patch.DownloadLrcPatch(src, nested, io_order, manifest_file)
     table = patch.prepare()
     if len(table) == 0:
         typer.echo("No music files found in src.")
@@ -0,0 +1,237 @@
+import array
+import json
+import os
+import pathlib
+import time
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+
+def _is_list_of(value: Any, kind: type) -> bool:
+    return isinstance(value, list) and all(isinstance(item, kind) for item in value)
+
+
+class TrackManifest:
+    """
+    Columnar list of track files found in src.
+    Directories are stored once in a table and tracks refer to them by index, along with their
+    name, size, mtime and inode. Source and destination paths are only built when requested.
+    Size and mtime are recorded at scan time and are not updated when tracks are patched.
+    """
+
+    VERSION = 1
+    # Coarsest common directory mtime resolution (FAT/exFAT).
+    MTIME_GRANULARITY_NS = 2 * 10**9
+    # Recorded for directories which must be listed again on the next refresh.
+    UNTRUSTED_MTIME = -1
+
+    def __init__(self, src: pathlib.Path, dst: pathlib.Path, nested: bool, suffixes: Iterable[str]) -> None:
+        self.src = src.resolve()
+        self.dst = dst.resolve()
+        self.nested = nested
+        self.suffixes = frozenset(suffixes)
+        self.overwrite_src = self.src.samefile(self.dst)
+        self.dst_is_dir = self.dst.is_dir()
+
+        self.dirs: list[str] = []
+        self.dir_mtimes: list[int] = []
+        self.dir_index = array.array("L")
+        self.names: list[str] = []
+        self.sizes = array.array("q")
+        self.mtimes = array.array("q")
+        self.inodes = array.array("Q")
+
+        self._dir_paths: dict[int, pathlib.Path] = {}
+
+    @classmethod
+    def scan(cls, src: pathlib.Path, dst: pathlib.Path, nested: bool, suffixes: Iterable[str]) -> "TrackManifest":
+        """Walk src and record every track file in it."""
+        manifest = cls(src, dst, nested, suffixes)
+        if manifest.src.is_file():
+            manifest._add_dir(str(manifest.src.parent), manifest.src.parent.stat().st_mtime_ns)
+            manifest._add_track(0, manifest.src.name, manifest.src.stat())
+        else:
+            manifest._scan_dir(str(manifest.src), set())
+        return manifest
+
+    def refresh(self) -> "TrackManifest":
+        """
+        Get an up to date manifest, reusing the tracks of every directory whose mtime has not changed.
+        Only changed directories are listed again and only newly created ones are walked.
+        """
+        if self.src.is_file():
+            return TrackManifest.scan(self.src, self.dst, self.nested, self.suffixes)
+
+        manifest = TrackManifest(self.src, self.dst, self.nested, self.suffixes)
+
+        rows: dict[int, list[int]] = {}
+        for index, dir_index in enumerate(self.dir_index):
+            rows.setdefault(dir_index, []).append(index)
+
+        known_dirs = set(self.dirs)
+        for dir_index, directory in enumerate(self.dirs):
+            try:
+                mtime = os.stat(directory).st_mtime_ns  # noqa: PTH116
+            except FileNotFoundError:
+                continue
+            except OSError:
+                mtime = self.UNTRUSTED_MTIME
+
+            if mtime == self.UNTRUSTED_MTIME or mtime != self.dir_mtimes[dir_index]:
+                manifest._scan_dir(directory, known_dirs)
+                continue
+
+            new_dir_index = manifest._add_dir(directory, mtime)
+            for index in rows.get(dir_index, []):
+                manifest.dir_index.append(new_dir_index)
+                manifest.names.append(self.names[index])
+                manifest.sizes.append(self.sizes[index])
+                manifest.mtimes.append(self.mtimes[index])
+                manifest.inodes.append(self.inodes[index])
+        return manifest
+
+    def matches(self, src: pathlib.Path, dst: pathlib.Path, nested: bool, suffixes: Iterable[str]) -> bool:
+        """Check whether this manifest was built for the given arguments."""
+        return (
+            self.src == src.resolve()
+            and self.dst == dst.resolve()
+            and self.nested == nested
+            and self.suffixes == frozenset(suffixes)
+        )
+
+    def save(self, path: pathlib.Path) -> None:
+        data = {
+            "version": self.VERSION,
+            "src": str(self.src),
+            "dst": str(self.dst),
+            "nested": self.nested,
+            "suffixes": sorted(self.suffixes),
+            "dirs": self.dirs,
+            "dir_mtimes": self.dir_mtimes,
+            "dir_index": self.dir_index.tolist(),
+            "names": self.names,
+            "sizes": self.sizes.tolist(),
+            "mtimes": self.mtimes.tolist(),
+            "inodes": self.inodes.tolist(),
+        }
+        path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "TrackManifest":
+        """Load a manifest saved by `save`. Raises ValueError if it is invalid."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data["version"] != cls.VERSION:
+                raise ValueError(f"Unsupported manifest version {data['version']}.")
+
+            if not (
+                isinstance(data["src"], str)
+                and isinstance(data["dst"], str)
+                and isinstance(data["nested"], bool)
+                and _is_list_of(data["suffixes"], str)
+                and _is_list_of(data["dirs"], str)
+                and _is_list_of(data["dir_mtimes"], int)
+                and _is_list_of(data["names"], str)
+            ):
+                raise ValueError(f"Invalid manifest {path}: unexpected value types.")
+
+            manifest = cls(pathlib.Path(data["src"]), pathlib.Path(data["dst"]), data["nested"], data["suffixes"])
+            manifest.dirs = data["dirs"]
+            manifest.dir_mtimes = data["dir_mtimes"]
+            manifest.dir_index.extend(data["dir_index"])
+            manifest.names = data["names"]
+            manifest.sizes.extend(data["sizes"])
+            manifest.mtimes.extend(data["mtimes"])
+            manifest.inodes.extend(data["inodes"])
+        except (OSError, KeyError, TypeError, OverflowError) as e:
+            raise ValueError(f"Invalid manifest {path}: {e}") from e
+
+        lengths = {len(manifest.dir_index), len(manifest.sizes), len(manifest.mtimes), len(manifest.inodes)}
+        if len(manifest.dirs) != len(manifest.dir_mtimes) or lengths != {len(manifest.names)}:
+            raise ValueError(f"Invalid manifest {path}: column lengths differ.")
+        if any(dir_index >= len(manifest.dirs) for dir_index in manifest.dir_index):
+            raise ValueError(f"Invalid manifest {path}: directory index out of range.")
+        return manifest
+
+    def src_path(self, index: int) -> pathlib.Path:
+        dir_index = self.dir_index[index]
+        dir_path = self._dir_paths.get(dir_index)
+        if dir_path is None:
+            dir_path = self._dir_paths[dir_index] = pathlib.Path(self.dirs[dir_index])
+        return dir_path / self.names[index]
+
+    def dst_path(self, index: int) -> pathlib.Path:
+        # Since we may be looking in nested dirs, if src = dst overwrite original files.
+        # If not then place all new files in dst directory.
+        # Note that if src != dst and nested = True there may be a situation where both
+        # `src/foo/song.mp3` and `src/bar/song.mp3` will be written to `dst/song.mp3`.
+        if self.overwrite_src:
+            return self.src_path(index)
+        if self.dst_is_dir:
+            return self.dst / self.names[index]
+        return self.dst
+
+    def src_paths(self) -> list[pathlib.Path]:
+        return [self.src_path(index) for index in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> tuple[pathlib.Path, pathlib.Path]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("track index out of range")
+        return self.src_path(index), self.dst_path(index)
+
+    def __iter__(self) -> Iterator[tuple[pathlib.Path, pathlib.Path]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def _add_dir(self, directory: str, mtime: int) -> int:
+        self.dirs.append(directory)
+        self.dir_mtimes.append(mtime)
+        return len(self.dirs) - 1
+
+    def _add_track(self, dir_index: int, name: str, st: os.stat_result) -> None:
+        self.dir_index.append(dir_index)
+        self.names.append(name)
+        self.sizes.append(st.st_size)
+        self.mtimes.append(st.st_mtime_ns)
+        self.inodes.append(st.st_ino)
+
+    def _scan_dir(self, directory: str, known_dirs: set[str]) -> None:
+        """
+        List one directory, walking any subdirectories which are not in known_dirs.
+        Unreadable directories and entries are skipped like `rglob` does, but the directory is kept
+        with an untrusted mtime so the next refresh retries it.
+        """
+        tracks: list[tuple[str, os.stat_result]] = []
+        subdirs: list[str] = []
+        try:
+            mtime = os.stat(directory).st_mtime_ns  # noqa: PTH116
+            # Work on plain strings so no Path is created per directory entry.
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.path.splitext(entry.name)[1] in self.suffixes:  # noqa: PTH122
+                            tracks.append((entry.name, entry.stat()))
+                        elif self.nested and entry.is_dir(follow_symlinks=False) and entry.path not in known_dirs:
+                            subdirs.append(entry.path)
+                    except OSError:
+                        continue
+            listed_mtime = os.stat(directory).st_mtime_ns  # noqa: PTH116
+        except OSError:
+            self._add_dir(directory, self.UNTRUSTED_MTIME)
+            return
+
+        # An entry added in the same timestamp tick as the listing leaves the mtime unchanged,
+        # so only trust mtimes which were stable during the listing and are older than one tick.
+        if listed_mtime != mtime or time.time_ns() - listed_mtime < self.MTIME_GRANULARITY_NS:
+            listed_mtime = self.UNTRUSTED_MTIME
+
+        dir_index = self._add_dir(directory, listed_mtime)
+        for name, st in tracks:
+            self._add_track(dir_index, name, st)
+        for subdir in subdirs:
+            self._scan_dir(subdir, known_dirs)
@@ -25,9 +25,17 @@ class ArtistNamePatch(patch.Patch):
     NEW_DELIMITER = "/"
     OLD_DELIMITERS = [",", "//", ";"]
 
-    def __init__(self, src: pathlib.Path, dst: pathlib.Path, nested: bool):
+    def __init__(
+        self,
+        src: pathlib.Path,
+        dst: pathlib.Path,
+        nested: bool,
+        io_order: utils.IoOrder = utils.IoOrder.PATH,
+        manifest_file: pathlib.Path | None = None,
+    ):
         super().__init__()
-        self.tracks = utils.get_tracks(src, dst, nested)
+        self.tracks = utils.get_tracks(src, dst, nested, manifest_file)
+        self.io_order = io_order
         self._changes: list[_ArtistChange] = []
 
     @classmethod
@@ -43,30 +51,33 @@ class ArtistNamePatch(patch.Patch):
         return modified
 
     def prepare(self) -> Table:
-        table = []
-        for track in self.tracks:
-            src_file = track[0]
-            dst_file = track[1]
+        # Read tracks in I/O order but keep changes in display order.
+        changes: dict[int, _ArtistChange] = {}
+        for index in utils.track_schedule(self.tracks, self.io_order):
+            src_file, dst_file = self.tracks[index]
 
             f = music_tag.load_file(src_file)
             original_tag: str = str(f[self.TAG_NAME])
             modified_tag: str = self.replace(original_tag)
 
-            colored_modified_tag = modified_tag
-            if original_tag != modified_tag:
-                colored_modified_tag = f"\033[31m{modified_tag}\033[0m"
-
-            self._changes.append(
-                _ArtistChange(
-                    src=src_file,
-                    dst=dst_file,
-                    original=original_tag,
-                    modified=modified_tag,
-                    has_change=original_tag != modified_tag,
-                )
+            changes[index] = _ArtistChange(
+                src=src_file,
+                dst=dst_file,
+                original=original_tag,
+                modified=modified_tag,
+                has_change=original_tag != modified_tag,
             )
 
-            table.append([original_tag, colored_modified_tag, src_file, dst_file])
+        table = []
+        for index in range(len(self.tracks)):
+            change = changes[index]
+            self._changes.append(change)
+
+            colored_modified_tag = change.modified
+            if change.has_change:
+                colored_modified_tag = f"\033[31m{change.modified}\033[0m"
+
+            table.append([change.original, colored_modified_tag, change.src, change.dst])
 
         return table
 
@@ -75,7 +86,11 @@ class ArtistNamePatch(patch.Patch):
         return ["Original Tag", "Modified Tag", "Source", "Destination"]
 
     def apply(self) -> None:
-        for change in self._changes:
+        if len(self._changes) != len(self.tracks):
+            return
+
+        for index in utils.track_schedule(self.tracks, self.io_order):
+            change = self._changes[index]
             if not change.has_change:
                 continue
 
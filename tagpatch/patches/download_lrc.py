@@ -29,9 +29,16 @@ class DownloadLrcPatch(patch.Patch):
 
     API_BASE_URL: str = "https://lrclib.net/api/get"
 
-    def __init__(self, src: pathlib.Path, nested: bool) -> None:
+    def __init__(
+        self,
+        src: pathlib.Path,
+        nested: bool,
+        io_order: utils.IoOrder = utils.IoOrder.PATH,
+        manifest_file: pathlib.Path | None = None,
+    ) -> None:
         super().__init__()
-        self.tracks = utils.get_tracks(src, src, nested)
+        self.tracks = utils.get_tracks(src, src, nested, manifest_file)
+        self.io_order = io_order
         self._changes: list[_LyricChange] = []
 
     @classmethod
@@ -166,8 +173,12 @@ class DownloadLrcPatch(patch.Patch):
                     return await self._process_track(client, track)
 
             async with httpx.AsyncClient() as client:
-                tasks = [process_with_semaphore(track) for track in self.tracks]
-                changes = await asyncio.gather(*tasks)
+                # Start tasks in I/O order, then restore display order.
+                schedule = utils.track_schedule(self.tracks, self.io_order)
+                tasks = [process_with_semaphore(self.tracks[index]) for index in schedule]
+                scheduled_changes = await asyncio.gather(*tasks)
+                changes_by_index = dict(zip(schedule, scheduled_changes))
+                changes = [changes_by_index[index] for index in range(len(self.tracks))]
                 self._changes.extend(changes)
 
                 for change in changes:
@@ -197,9 +208,13 @@ class DownloadLrcPatch(patch.Patch):
         return ["Source", "Destination", "Action", "Type"]
 
     def apply(self) -> None:
+        if len(self._changes) != len(self.tracks):
+            return
+
         change_log = "\n"
 
-        for change in self._changes:
+        for index in utils.track_schedule(self.tracks, self.io_order):
+            change = self._changes[index]
             if change.skip_reason:
                 continue
 
@@ -21,9 +21,17 @@ class EmbedLyricsPatch(patch.Patch):
     _HELP_TEXT: str = "A patch which embeds .lrc files of the same name into the track file."
     TAG_NAME: str = "lyrics"
 
-    def __init__(self, src: pathlib.Path, dst: pathlib.Path, nested: bool) -> None:
+    def __init__(
+        self,
+        src: pathlib.Path,
+        dst: pathlib.Path,
+        nested: bool,
+        io_order: utils.IoOrder = utils.IoOrder.PATH,
+        manifest_file: pathlib.Path | None = None,
+    ) -> None:
         super().__init__()
-        self.tracks = utils.get_tracks(src, dst, nested)
+        self.tracks = utils.get_tracks(src, dst, nested, manifest_file)
+        self.io_order = io_order
         self._changes: list[_EmbedChange] = []
 
     @classmethod
@@ -68,7 +76,11 @@ class EmbedLyricsPatch(patch.Patch):
         return ["Lyric File", "Source", "Destination"]
 
     def apply(self) -> None:
-        for change in self._changes:
+        if len(self._changes) != len(self.tracks):
+            return
+
+        for index in utils.track_schedule(self.tracks, self.io_order):
+            change = self._changes[index]
             try:
                 change.dst.touch()
                 if not change.src.samefile(change.dst):
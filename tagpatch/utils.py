@@ -1,38 +1,159 @@
+import enum
+import logging
+import os
 import pathlib
 import re
+import struct
+from collections.abc import Callable, Hashable, Sequence
+from typing import Any
+
+from tagpatch.manifest import TrackManifest
+
+logger = logging.getLogger(__name__)
 
 KNOWN_TRACK_EXTENSIONS = {".ogg", ".mp3", ".m4a", ".flac", ".opus", ".wav"}
 
+# Linux FIEMAP ioctl, see linux/fiemap.h.
+_FS_IOC_FIEMAP = 0xC020660B
+_FIEMAP_EXTENT_UNKNOWN = 0x00000002
+_FIEMAP_HEADER = struct.Struct("=QQLLLL")
+_FIEMAP_EXTENT = struct.Struct("=QQQQQLLLL")
+
+
+class IoOrder(str, enum.Enum):
+    """Order in which track files are read and written."""
 
-def get_tracks(src: pathlib.Path, dst: pathlib.Path, nested: bool = False) -> list[tuple[pathlib.Path, pathlib.Path]]:
+    INODE = "inode"
+    EXTENT = "extent"
+    PATH = "path"
+
+
+def get_tracks(
+    src: pathlib.Path, dst: pathlib.Path, nested: bool = False, manifest_file: pathlib.Path | None = None
+) -> TrackManifest:
     """
-    Get a list of source and destination absolute paths for track files.
+    Get a manifest of source and destination absolute paths for track files.
     Input params src and dst must be both files or both directories.
+    If manifest_file is given, a manifest saved there by a previous run is revalidated instead of
+    walking src again, and the resulting manifest is saved back to it.
     """
     if not ((src.is_dir() and dst.is_dir()) or (src.is_file() and dst.is_file())):
         raise ValueError("Source and destination must be both files or both directories.")
 
-    tracks: list[tuple[pathlib.Path, pathlib.Path]] = []
+    tracks: TrackManifest | None = None
+    if manifest_file is not None and manifest_file.is_file():
+        try:
+            cached = TrackManifest.load(manifest_file)
+        except ValueError as e:
+            logger.warning(f"ignoring manifest: {e}")
+        else:
+            if cached.matches(src, dst, nested, KNOWN_TRACK_EXTENSIONS):
+                tracks = cached.refresh()
+
+    if tracks is None:
+        tracks = TrackManifest.scan(src, dst, nested, KNOWN_TRACK_EXTENSIONS)
+    if manifest_file is not None:
+        try:
+            tracks.save(manifest_file)
+        except OSError as e:
+            logger.warning(f"failed to save manifest {manifest_file}: {e}")
+    return tracks
+
+
+def _first_extent(path: pathlib.Path) -> int | None:
+    """Physical offset of the first extent of a file via FIEMAP, if the platform supports it."""
+    try:
+        import fcntl
+    except ImportError:
+        return None
+
+    # No FIEMAP_FLAG_SYNC, ordering does not need exact offsets for dirty pages.
+    request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    _FIEMAP_HEADER.pack_into(request, 0, 0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            fcntl.ioctl(fd, _FS_IOC_FIEMAP, request)
+        finally:
+            os.close(fd)
+    except OSError:
+        return None
+
+    mapped_extents = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+    if mapped_extents == 0:
+        return None
+    extent = _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)
+    # Delayed allocation and other unflushed extents report a physical offset of 0.
+    if extent[5] & _FIEMAP_EXTENT_UNKNOWN:
+        return None
+    return int(extent[1])
+
 
-    if src.is_dir():
-        files_list = pathlib.Path(src).rglob("*") if nested else pathlib.Path(src).iterdir()
+def _inode_key(path: pathlib.Path) -> tuple[int, int]:
+    try:
+        st = path.stat()
+    except OSError:
+        return (0, 0)
+    return (st.st_dev, st.st_ino)
 
-        overwrite_src: bool = src.samefile(dst)
 
-        for file in files_list:
-            if file.is_file() and file.suffix in KNOWN_TRACK_EXTENSIONS:
-                # Since we may be looking in nested dirs, if src = dst overwrite original files.
-                # If not then place all new files in dst directory.
-                # Note that if src != dst and nested = True there may be a situation where both
-                # `src/foo/song.mp3` and `src/bar/song.mp3` will be written to `dst/song.mp3`.
-                if overwrite_src:
-                    tracks.append((file.resolve(), file.resolve().parent / file.name))
-                else:
-                    tracks.append((file.resolve(), dst.resolve() / file.name))
+def _extent_key(path: pathlib.Path) -> tuple[int, int]:
+    # Files without a mappable extent (inline data, unsupported fs) sort after mapped ones by inode.
+    extent = _first_extent(path)
+    if extent is None:
+        return (1, _inode_key(path)[1])
+    return (0, extent)
+
+
+def io_schedule(
+    paths: Sequence[pathlib.Path], io_order: IoOrder = IoOrder.PATH, inodes: Sequence[int] | None = None
+) -> list[int]:
+    """
+    Get the indices of paths in the order they should be read or written.
+    Paths are batched per directory and files within a directory are sorted by path, inode number
+    or physical extent. Directories are then visited in order of the smallest key in their batch.
+    Known inode numbers may be passed to avoid a stat per path.
+    The input order is left untouched so it can still be used for display.
+    """
+    key: Callable[[pathlib.Path], Any]
+    if io_order == IoOrder.INODE:
+        key = _inode_key
+    elif io_order == IoOrder.EXTENT:
+        key = _extent_key
     else:
-        tracks.append((src.resolve(), dst.resolve()))
+        key = str
 
-    return tracks
+    keys = list(inodes) if inodes is not None and io_order == IoOrder.INODE else [key(path) for path in paths]
+    return _batch_schedule([path.parent for path in paths], keys)
+
+
+def track_schedule(tracks: TrackManifest, io_order: IoOrder = IoOrder.PATH) -> list[int]:
+    """
+    Get the indices of tracks in the order their files should be read or written.
+    Works on the manifest columns, only building paths for the extent order.
+    """
+    keys: Sequence[Any]
+    if io_order == IoOrder.INODE:
+        keys = tracks.inodes
+    elif io_order == IoOrder.EXTENT:
+        keys = [_extent_key(tracks.src_path(index)) for index in range(len(tracks))]
+    else:
+        keys = [tracks.dirs[dir_index] + os.sep + name for dir_index, name in zip(tracks.dir_index, tracks.names)]
+    return _batch_schedule(tracks.dir_index, keys)
+
+
+def _batch_schedule(batch_ids: Sequence[Hashable], keys: Sequence[Any]) -> list[int]:
+    """Group indices by batch id, sort each batch by key and order batches by their smallest key."""
+    batches: dict[Hashable, list[int]] = {}
+    for index, batch_id in enumerate(batch_ids):
+        batches.setdefault(batch_id, []).append(index)
+
+    schedule: list[int] = []
+    for batch in batches.values():
+        batch.sort(key=lambda index: keys[index])
+    for batch in sorted(batches.values(), key=lambda batch: keys[batch[0]]):
+        schedule.extend(batch)
+    return schedule
 
 
 def escape_ansi(line: str) -> str:
@@ -0,0 +1,137 @@
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tagpatch import utils
+from tagpatch.manifest import TrackManifest
+
+
+class TestTrackManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = pathlib.Path(tempfile.mkdtemp()).resolve()
+        self.src = self.tmp / "music"
+        (self.src / "album1").mkdir(parents=True)
+        (self.src / "album1/a.mp3").write_bytes(b"a")
+        (self.src / "album1/cover.jpg").write_bytes(b"c")
+        (self.src / "b.flac").write_bytes(b"bb")
+        self.manifest_file = self.tmp / "manifest.json"
+
+    def test_scan(self):
+        """Test scan records tracks with their size and inode."""
+        tracks = TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS)
+        self.assertEqual(sorted(tracks.names), ["a.mp3", "b.flac"])
+        for src_file, dst_file in tracks:
+            self.assertEqual(src_file, dst_file)
+            index = tracks.names.index(src_file.name)
+            self.assertEqual(tracks.sizes[index], src_file.stat().st_size)
+            self.assertEqual(tracks.inodes[index], src_file.stat().st_ino)
+
+    def test_save_load(self):
+        """Test a saved manifest loads back with the same tracks."""
+        tracks = TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS)
+        tracks.save(self.manifest_file)
+        loaded = TrackManifest.load(self.manifest_file)
+        self.assertTrue(loaded.matches(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS))
+        self.assertEqual(list(loaded), list(tracks))
+        self.assertEqual(loaded.inodes, tracks.inodes)
+
+    def test_load_invalid(self):
+        """Test loading a corrupt manifest raises ValueError."""
+        self.manifest_file.write_text("{}")
+        with self.assertRaises(ValueError):
+            TrackManifest.load(self.manifest_file)
+
+    def test_load_invalid_columns(self):
+        """Test loading a manifest with inconsistent columns raises ValueError."""
+        TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS).save(self.manifest_file)
+        data = json.loads(self.manifest_file.read_text())
+        invalid = [
+            ("sizes", []),
+            ("dir_index", [len(data["dirs"])] * len(data["names"])),
+            ("names", [1, 2]),
+            ("names", "ab"),
+            ("dirs", [str(self.src), 1]),
+            ("dir_mtimes", ["0"] * len(data["dirs"])),
+            ("nested", "yes"),
+            ("suffixes", ".mp3"),
+        ]
+        for column, value in invalid:
+            self.manifest_file.write_text(json.dumps({**data, column: value}))
+            with self.assertRaises(ValueError):
+                TrackManifest.load(self.manifest_file)
+
+    def test_track_schedule(self):
+        """Test track_schedule batches by directory and only builds paths for the extent order."""
+        tracks = TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS)
+        by_path = sorted(range(len(tracks)), key=lambda index: str(tracks.src_path(index)))
+        with mock.patch.object(TrackManifest, "src_path", side_effect=AssertionError):
+            self.assertEqual(utils.track_schedule(tracks, utils.IoOrder.PATH), by_path)
+            utils.track_schedule(tracks, utils.IoOrder.INODE)
+        self.assertEqual(sorted(utils.track_schedule(tracks, utils.IoOrder.EXTENT)), [0, 1])
+
+        """Test an unreadable subdirectory is skipped and retried on refresh."""
+        unreadable = str(self.src / "album1")
+        scandir = os.scandir
+
+        def failing_scandir(path):
+            if path == unreadable:
+                raise PermissionError(path)
+            return scandir(path)
+
+        with mock.patch("tagpatch.manifest.os.scandir", side_effect=failing_scandir):
+            tracks = TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS)
+        self.assertEqual(tracks.names, ["b.flac"])
+        self.assertEqual(tracks.dir_mtimes[tracks.dirs.index(unreadable)], TrackManifest.UNTRUSTED_MTIME)
+        self.assertEqual(sorted(tracks.refresh().names), ["a.mp3", "b.flac"])
+
+    def test_refresh_reuses_old_dirs(self):
+        """Test refresh reuses directories whose mtime is old and unchanged."""
+        old = (1_000_000_000, 1_000_000_000)
+        os.utime(self.src / "album1", old)
+        tracks = TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS)
+        (self.src / "album1/d.mp3").write_bytes(b"d")
+        os.utime(self.src / "album1", old)
+        self.assertNotIn("d.mp3", tracks.refresh().names)
+
+    def test_refresh_racy_dir(self):
+        """Test refresh lists directories again when their mtime was too recent to trust."""
+        tracks = TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS)
+        mtime = (self.src / "album1").stat().st_mtime_ns
+        (self.src / "album1/d.mp3").write_bytes(b"d")
+        os.utime(self.src / "album1", ns=(mtime, mtime))
+        self.assertIn("d.mp3", tracks.refresh().names)
+
+    def test_refresh(self):
+        """Test refresh picks up tracks in changed and new directories only."""
+        tracks = TrackManifest.scan(self.src, self.src, True, utils.KNOWN_TRACK_EXTENSIONS)
+        (self.src / "album2").mkdir()
+        (self.src / "album2/c.ogg").write_bytes(b"c")
+        (self.src / "album1/a.mp3").unlink()
+
+        refreshed = tracks.refresh()
+        self.assertEqual(sorted(refreshed.names), ["b.flac", "c.ogg"])
+        self.assertEqual(refreshed.src_path(refreshed.names.index("c.ogg")), self.src / "album2/c.ogg")
+
+    def test_get_tracks_manifest_file(self):
+        """Test get_tracks saves a manifest and reuses it on the next call."""
+        tracks = utils.get_tracks(self.src, self.src, nested=True, manifest_file=self.manifest_file)
+        self.assertTrue(self.manifest_file.is_file())
+        self.assertEqual(list(utils.get_tracks(self.src, self.src, True, self.manifest_file)), list(tracks))
+
+    def test_get_tracks_manifest_save_error(self):
+        """Test get_tracks still returns tracks when the manifest cannot be saved."""
+        manifest_file = self.tmp / "missing/manifest.json"
+        with self.assertLogs("tagpatch.utils", level="WARNING"):
+            tracks = utils.get_tracks(self.src, self.src, nested=True, manifest_file=manifest_file)
+        self.assertEqual(len(tracks), 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import array
 import pathlib
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
 import music_tag
 
@@ -46,6 +50,32 @@ class TestArtistName(unittest.TestCase):
         tag: str = str(f["Artist"])
         self.assertEqual("Cartoon/Daniel Levi", tag)
 
+    def test_artist_name_apply_before_prepare(self):
+        """Test apply is a no-op when prepare has not run."""
+        patch = artist_name.ArtistNamePatch(self.src, self.dst, nested=True)
+        patch.apply()
+        self.assertFalse((self.dst / "test.mp3").exists())
+
+    def test_artist_name_io_order(self):
+        """Test the table keeps discovery order while apply writes in scheduled order."""
+        tmp = pathlib.Path(tempfile.mkdtemp()).resolve()
+        self.addCleanup(shutil.rmtree, tmp)
+        for name in ["a.mp3", "b.mp3", "c.mp3"]:
+            shutil.copy2(self.src / "song1/test.mp3", tmp / name)
+
+        patch = artist_name.ArtistNamePatch(tmp, tmp, nested=False, io_order=utils.IoOrder.INODE)
+        discovered = [track[0] for track in patch.tracks]
+        # Reverse the inode order so the schedule differs from discovery order.
+        patch.tracks.inodes = array.array("Q", range(len(discovered), 0, -1))
+
+        table = patch.prepare()
+        self.assertEqual(discovered, [row[2] for row in table])
+
+        with mock.patch.object(artist_name.typer, "echo") as echo:
+            patch.apply()
+        patched = [call.args[0] for call in echo.call_args_list]
+        self.assertEqual([f"Patched - {path}" for path in reversed(discovered)], patched)
+
     def tearDown(self):
         """Delete all .mp3 files in the tests/output directory."""
         for file in self.dst.iterdir():
@@ -1,5 +1,7 @@
+import fcntl
 import pathlib
 import unittest
+from unittest import mock
 
 from tagpatch import utils
 
@@ -41,6 +43,51 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(src_track_file, tracks[0][0])
         self.assertEqual(dst_track_file, tracks[0][1])
 
+    def test_io_schedule_batches_directories(self):
+        """Test io_schedule keeps files of one directory together for every io order."""
+        root = pathlib.Path().cwd().resolve()
+        paths = [
+            root / "tagpatch/utils.py",
+            root / "tests/data/song1/test.mp3",
+            root / "tagpatch/types.py",
+            root / "tests/data/song1/ATTRIBUTION.txt",
+        ]
+        for io_order in utils.IoOrder:
+            schedule = utils.io_schedule(paths, io_order)
+            self.assertEqual(sorted(schedule), list(range(len(paths))))
+            parents = [paths[index].parent for index in schedule]
+            self.assertEqual(parents[0], parents[1])
+            self.assertEqual(parents[2], parents[3])
+
+    def test_io_schedule_path(self):
+        """Test io_schedule with io_order=path sorts by path."""
+        paths = [self.src / "b/2.mp3", self.src / "a/1.mp3", self.src / "b/1.mp3"]
+        self.assertEqual(utils.io_schedule(paths, utils.IoOrder.PATH), [1, 2, 0])
+
+    def test_io_schedule_inode(self):
+        """Test io_schedule with io_order=inode sorts files within a directory by the given inodes."""
+        paths = [self.src / "a/1.mp3", self.src / "a/2.mp3", self.src / "a/3.mp3", self.src / "b/1.mp3"]
+        inodes = [30, 10, 20, 5]
+        self.assertEqual(utils.io_schedule(paths, utils.IoOrder.INODE, inodes), [3, 1, 2, 0])
+
+    def test_first_extent_unknown(self):
+        """Test _first_extent ignores extents with FIEMAP_EXTENT_UNKNOWN set, e.g. delayed allocation."""
+        track = self.src / "song1/test.mp3"
+
+        def fiemap(physical, flags):
+            def ioctl(fd, request, buffer):
+                utils._FIEMAP_HEADER.pack_into(buffer, 0, 0, 0, 0, 1, 1, 0)
+                utils._FIEMAP_EXTENT.pack_into(
+                    buffer, utils._FIEMAP_HEADER.size, 0, physical, 4096, 0, 0, flags, 0, 0, 0
+                )
+
+            return mock.patch.object(fcntl, "ioctl", side_effect=ioctl)
+
+        with fiemap(46174695424, 0x1):
+            self.assertEqual(utils._first_extent(track), 46174695424)
+        with fiemap(0, 0x7):
+            self.assertIsNone(utils._first_extent(track))
+
 
 if __name__ == "__main__":
     unittest.main()